@@ -1,10 +1,12 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+import hashlib
+import os
+import re
+import threading
 import time
+import simdjson
 
 # Set page configuration
 st.set_page_config(
@@ -46,23 +48,38 @@ google_sheets_url = st.sidebar.text_input(
     help="Enter the URL of your consolidated Google Sheet"
 )
 
+# Precompiled once; convert_to_csv_url runs on every rerun through the loader
+_SHEET_ID_RE = re.compile(r'/d/([^/]+)')
+_GID_RE = re.compile(r'gid=(\d+)')
+
 # Function to convert Google Sheets URL to CSV export URL
 def convert_to_csv_url(sheets_url):
     """Convert Google Sheets URL to CSV export URL"""
     try:
-        if '/d/' in sheets_url:
-            sheet_id = sheets_url.split('/d/')[1].split('/')[0]
-            gid = "0"
-            if 'gid=' in sheets_url:
-                gid = sheets_url.split('gid=')[1].split('&')[0].split('#')[0]
-            csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
-            return csv_url
-        else:
+        match = _SHEET_ID_RE.search(sheets_url)
+        if not match:
             return None
+        gid_match = _GID_RE.search(sheets_url)
+        gid = gid_match.group(1) if gid_match else "0"
+        return f"https://docs.google.com/spreadsheets/d/{match.group(1)}/export?format=csv&gid={gid}"
     except Exception as e:
         st.error(f"Error converting URL: {e}")
         return None
 
+# Per-session HTTP cache for conditional sheet fetches: {csv_url: (etag, last_modified, df)}
+@st.cache_resource
+def _sheet_http_cache():
+    return {}
+
+# Parquet snapshots of parsed sheets - restarts reload these instead of refetching
+SHEET_SNAPSHOT_DIR = "data/sheet_cache"
+SHEET_SNAPSHOT_TTL = 300
+
+def _sheet_snapshot_path(csv_url):
+    return os.path.join(
+        SHEET_SNAPSHOT_DIR, hashlib.sha1(csv_url.encode()).hexdigest() + ".parquet"
+    )
+
 # Function to load consolidated data
 @st.cache_data(ttl=300)
 def load_consolidated_data(sheets_url):
@@ -71,17 +88,279 @@ def load_consolidated_data(sheets_url):
         csv_url = convert_to_csv_url(sheets_url)
         if not csv_url:
             return None
-        
-        df = pd.read_csv(csv_url)
+
+        import io
+        from pyarrow import csv as pacsv
+        from utils.http import get_http_session
+
+        # Cold start (fresh process, empty in-memory cache): a recent Parquet
+        # snapshot beats re-downloading and re-parsing the sheet
+        snapshot = _sheet_snapshot_path(csv_url)
+        if (os.path.exists(snapshot)
+                and time.time() - os.path.getmtime(snapshot) < SHEET_SNAPSHOT_TTL):
+            return pd.read_parquet(snapshot)
+
+        # Revalidate with a conditional GET once the short cache expires; a 304
+        # reuses the previously parsed frame instead of re-downloading the sheet
+        http_cache = _sheet_http_cache()
+        etag, last_modified, cached_df = http_cache.get(csv_url, (None, None, None))
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        response = get_http_session().get(csv_url, headers=headers, timeout=30)
+        if response.status_code == 304 and cached_df is not None:
+            return cached_df
+        response.raise_for_status()
+
+        # Arrow's CSV reader parses multithreaded and dictionary-encodes the
+        # repeated scheme/stock strings, arriving in pandas as categoricals
+        table = pacsv.read_csv(
+            io.BytesIO(response.content),
+            convert_options=pacsv.ConvertOptions(auto_dict_encode=True)
+        )
+        df = table.to_pandas()
         df.columns = df.columns.str.strip()
         df = df.dropna(how='all')
         df = df.reset_index(drop=True)
+        # Parse percent strings once at ingest so reruns never repeat the string ops
+        if '% of Total Holdings' in df:
+            df['Holdings %'] = (
+                df['% of Total Holdings'].astype('string').str.rstrip('%').astype('float32')
+            )
+        # Sheet numerics are far below float64/int64 range; halving their width
+        # halves the bytes every downstream groupby and sort has to move
+        for col in df.select_dtypes('integer').columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        for col in df.select_dtypes('float').columns:
+            df[col] = pd.to_numeric(df[col], downcast='float')
+        http_cache[csv_url] = (
+            response.headers.get('ETag'), response.headers.get('Last-Modified'), df
+        )
+        if not os.path.isdir(SHEET_SNAPSHOT_DIR):
+            os.makedirs(SHEET_SNAPSHOT_DIR)
+        df.to_parquet(snapshot, compression='zstd')
         return df
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
+# Cell styles per conviction category, mapped column-wise in the styled tables
+CONVICTION_STYLES = {
+    "🟢 High Conviction": 'background-color: #38ef7d; color: white',
+    "🟡 Medium Conviction": 'background-color: #f5576c; color: white',
+    "🔵 Low Conviction": 'background-color: #4facfe; color: white',
+}
+
+# Pre-computed top-stocks comparison (written by utils/comparator.py)
+PROCESSED_DIR = "data/processed"
+
+@st.cache_data(ttl=30)
+def _latest_comparison_path(dir_path):
+    """Find the newest comparison_output*.json in one scandir pass (one stat per entry)"""
+    best, best_mtime = None, -1.0
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.name.startswith("comparison_output") and entry.name.endswith(".json"):
+                    mtime = entry.stat().st_mtime
+                    if mtime > best_mtime:
+                        best, best_mtime = entry.path, mtime
+    except FileNotFoundError:
+        pass
+    return best, best_mtime
+
+# Shared simdjson parser - reusing one instance lets it recycle its buffers
+_JSON_PARSER = simdjson.Parser()
+
+@st.cache_data(ttl=300)
+def _comparison_frames(path, mtime):
+    """Build small/mid cap DataFrames from the comparison JSON, cached on (path, mtime)"""
+    # simdjson On-Demand parsing: only the subtrees we touch get materialized
+    doc = _JSON_PARSER.load(path)
+    frames = []
+    for key in ("small_cap", "mid_cap"):
+        cap_df = pd.DataFrame(doc[key].as_list())
+        # Sentiment comes from a tiny fixed alphabet - categorical is smaller and maps faster
+        cap_df["Sentiment"] = pd.Categorical(
+            cap_df["Sentiment"], categories=["Buy", "Hold", "Trimmed", "Exited", "Not Held"]
+        )
+        frames.append(cap_df)
+    return tuple(frames)
+
+# Row backgrounds for the inline-HTML summary tables
+SENTIMENT_BG = {
+    'Buy': '#d4edda',
+    'Hold': '#fff3cd',
+    'Trimmed': '#f8d7da',
+    'Exited': '#f8d7da',
+    'Not Held': '#e2e3e5',
+}
+
+@st.cache_data
+def summary_table_html(rows):
+    """Render a small summary table as plain HTML - cheaper than Styler/Arrow for ~10 rows"""
+    body = "".join(
+        f"<tr><td>{stock}</td><td align='center'>{funds}</td><td align='center'>{aum:.1f}%</td>"
+        f"<td style='background:{SENTIMENT_BG.get(sentiment, '#e2e3e5')}'>{sentiment}</td></tr>"
+        for stock, funds, aum, sentiment in rows
+    )
+    return (
+        "<table width='100%'><tr><th>Stock</th><th># Funds Holding</th>"
+        "<th>Avg % AUM</th><th>Sentiment</th></tr>" + body + "</table>"
+    )
+
+@st.cache_data
+def make_sentiment_pie(items):
+    """Build the sentiment pie as a plain {data, layout} dict, cached on the (sentiment, count) tuple
+
+    st.plotly_chart forwards the dict straight to Plotly.js, skipping
+    Figure construction and schema validation on the Python side.
+    """
+    names, values = zip(*items)
+    return {
+        'data': [{
+            'type': 'pie',
+            'labels': list(names),
+            'values': list(values),
+            'textinfo': 'percent+label'
+        }],
+        'layout': {
+            'title': {'text': "🗳️ Sentiment Distribution Across Top Stocks"},
+            'height': 400
+        }
+    }
+
+MARKET_CAP_CATEGORIES = ['Small Cap', 'Mid Cap', 'Large Cap', 'Not Available']
+
+@st.cache_data(ttl=86400, persist="disk", max_entries=20, show_spinner=False)
+def fetch_market_caps_cached(names):
+    """Memoize a whole cap fetch on the tuple of stock names, bounded to 20 universes
+
+    Caps move slowly, so a day-long TTL persisted to disk means a restart
+    reloads from the cache file instead of refetching every ticker.
+    """
+    from scraper.market_cap import fetch_market_caps
+    return fetch_market_caps(list(names))
+
+# Process-wide cap store for stale-while-revalidate: {names: (caps, fetched_at)}
+@st.cache_resource
+def _cap_store():
+    return {}
+
+CAP_REVALIDATE_AFTER = 3600  # serve stale entries this old, but refresh behind them
+
+def _refresh_caps(store, names):
+    """Background revalidation; plain-dict writes only, no Streamlit calls off-thread"""
+    from scraper.market_cap import fetch_market_caps
+    try:
+        store[names] = (fetch_market_caps(list(names)), time.time())
+    finally:
+        store.pop('refreshing', None)
+
+def enrich_with_market_caps(processed_df, stock_col):
+    """Fill market-cap columns from concurrent yfinance lookups of the unique stocks
+
+    Stale-while-revalidate: a known universe renders instantly from the
+    process-wide store, and anything older than an hour is refreshed by a
+    daemon thread - the next rerun picks up the new caps.
+    """
+    names = tuple(processed_df[stock_col].cat.categories)
+    store = _cap_store()
+    cached = store.get(names)
+    if cached is None:
+        with st.spinner("Fetching market caps..."):
+            cap_map = fetch_market_caps_cached(names)
+        store[names] = (cap_map, time.time())
+    else:
+        cap_map, fetched_at = cached
+        if time.time() - fetched_at > CAP_REVALIDATE_AFTER and not store.get('refreshing'):
+            store['refreshing'] = True
+            threading.Thread(target=_refresh_caps, args=(store, names), daemon=True).start()
+
+    processed_df['Market_Cap_USD'] = processed_df[stock_col].map(cap_map).astype('float32')
+    # Same INR-crore cutoffs as scraper.market_cap.categorize_market_cap, as one pd.cut
+    crores = processed_df['Market_Cap_USD'] * 83 / 1e7
+    processed_df['Market_Cap_Category'] = pd.cut(
+        crores, bins=[-np.inf, 5000, 20000, np.inf],
+        labels=MARKET_CAP_CATEGORIES[:3], right=False
+    ).cat.add_categories('Not Available').fillna('Not Available')
+
+@st.cache_data(show_spinner=False)
+def compute_convergence_table(overlap_matrix):
+    """Pairwise Jaccard table from the overlap matrix; cached so reruns skip the math"""
+    overlap_np = overlap_matrix.to_numpy()
+    schemes = overlap_matrix.index.to_numpy()
+    sizes = np.diag(overlap_np)
+    union = sizes[:, None] + sizes[None, :] - overlap_np
+    jaccard = np.where(union > 0, overlap_np / union * 100, 0)
+
+    upper = np.triu_indices(len(schemes), k=1)
+    return pd.DataFrame({
+        'Scheme 1': schemes[upper[0]],
+        'Scheme 2': schemes[upper[1]],
+        'Common Stocks': overlap_np[upper].astype(int),
+        'Convergence Score': np.round(jaccard[upper], 1)
+    }).sort_values('Convergence Score', ascending=False)
+
+@st.cache_data(show_spinner=False)
+def compute_scheme_holdings(processed_df, scheme_col):
+    """Holdings count per scheme, sorted; cached so reruns skip the groupby"""
+    scheme_holdings = (
+        processed_df.groupby(scheme_col, observed=True).size().reset_index(name='Holdings_Count')
+    )
+    scheme_holdings['Holdings_Count'] = scheme_holdings['Holdings_Count'].astype('int32')
+    return scheme_holdings.sort_values('Holdings_Count', ascending=False)
+
+@st.cache_data
+def apply_explorer_filters(df, scheme_col, stock_col, schemes, stocks, conviction_stocks):
+    """Apply the Data Explorer filters as one combined mask, memoized on the selections"""
+    mask = np.ones(len(df), dtype=bool)
+    if schemes:
+        mask &= df[scheme_col].isin(schemes).to_numpy()
+    if stocks:
+        mask &= df[stock_col].isin(stocks).to_numpy()
+    if conviction_stocks is not None:
+        mask &= df[stock_col].isin(conviction_stocks).to_numpy()
+    # One slice at the end instead of a new intermediate frame per predicate
+    return df[mask]
+
+@st.cache_data(show_spinner=False)
+def to_csv_bytes(df):
+    """Encode a frame for download once per distinct frame, not on every rerun
+
+    Arrow's CSV writer serializes column-wise in C++ straight into the
+    buffer - no full-frame Python string is ever materialized.
+    """
+    import io
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+
+    buf = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue()
+
+def fast_to_csv(df):
+    """Serialize a small quoting-free DataFrame to CSV, skipping pandas' generic writer"""
+    header = ",".join(df.columns) + "\n"
+    fmt = ",".join(["{}"] * len(df.columns)) + "\n"
+    return header + "".join(fmt.format(*row) for row in df.to_numpy())
+
+def load_comparison_summary():
+    """Load the pre-computed comparison summary without re-parsing on every rerun"""
+    path, mtime = _latest_comparison_path(PROCESSED_DIR)
+    if path is None:
+        return None
+    try:
+        return _comparison_frames(path, mtime)
+    except Exception as e:
+        st.error(f"Error loading comparison summary: {e}")
+        return None
+
 # Enhanced data processing function
+@st.cache_data(show_spinner=False)
 def process_consolidated_data_enhanced(df):
     """Enhanced processing with conviction analysis"""
     if df is None or df.empty:
@@ -105,39 +384,54 @@ def process_consolidated_data_enhanced(df):
     if scheme_col is None or stock_col is None:
         st.error("Could not identify scheme and stock columns.")
         return None
-    
-    # Calculate conviction metrics
-    stock_conviction = df.groupby(stock_col).agg({
-        scheme_col: ['count', 'nunique', list]
-    }).reset_index()
-    stock_conviction.columns = ['Stock', 'Total_Appearances', 'Scheme_Count', 'Schemes_List']
+
+    # Low-cardinality names repeated across many rows: categorical codes make every
+    # downstream groupby/nunique/isin/crosstab work on ints instead of Python strings
+    df[scheme_col] = df[scheme_col].astype('category')
+    df[stock_col] = df[stock_col].astype('category')
+
+    # Calculate conviction metrics (numeric-only fast path; scheme lists are built
+    # lazily in tab2 for just the displayed stocks)
+    stock_conviction = df.groupby(stock_col, sort=False, observed=True)[scheme_col].agg(
+        Total_Appearances='size', Scheme_Count='nunique'
+    ).reset_index()
+    stock_conviction.columns = ['Stock', 'Total_Appearances', 'Scheme_Count']
     
     # Calculate conviction score (percentage of schemes holding this stock)
     total_schemes = df[scheme_col].nunique()
     stock_conviction['Conviction_Score'] = (stock_conviction['Scheme_Count'] / total_schemes * 100).round(1)
     
-    # Categorize conviction levels
-    def get_conviction_category(score):
-        if score >= 50:
-            return "🟢 High Conviction"
-        elif score >= 25:
-            return "🟡 Medium Conviction"
-        else:
-            return "🔵 Low Conviction"
-    
-    stock_conviction['Conviction_Category'] = stock_conviction['Conviction_Score'].apply(get_conviction_category)
+    # Categorize conviction levels in one vectorized branch
+    scores = stock_conviction['Conviction_Score'].to_numpy()
+    stock_conviction['Conviction_Category'] = np.select(
+        [scores >= 50, scores >= 25],
+        ["🟢 High Conviction", "🟡 Medium Conviction"],
+        default="🔵 Low Conviction"
+    )
     
+    # These counts and percentages never need 64-bit width; downcasting halves the
+    # bytes every later sort, filter, and plotly serialization has to move
+    stock_conviction = stock_conviction.astype({
+        'Total_Appearances': 'int32', 'Scheme_Count': 'int16', 'Conviction_Score': 'float32'
+    })
+
     # Sort by conviction score
     stock_conviction = stock_conviction.sort_values('Conviction_Score', ascending=False)
     
-    processed_df = df.copy()
-    processed_df['Market_Cap_Category'] = 'Not Available'
+    # st.cache_data already hands each caller its own copy of df, so assigning
+    # new columns in place is safe and skips duplicating the whole frame
+    processed_df = df
+    processed_df['Market_Cap_Category'] = pd.Categorical(
+        ['Not Available'] * len(df), categories=MARKET_CAP_CATEGORIES
+    )
     
     return processed_df, scheme_col, stock_col, stock_conviction, total_schemes
 
 # Function to create conviction gauge
 def create_conviction_gauge(conviction_score, title):
     """Create a conviction gauge chart"""
+    import plotly.graph_objects as go
+
     fig = go.Figure(go.Indicator(
         mode = "gauge+number+delta",
         value = conviction_score,
@@ -162,12 +456,55 @@ def create_conviction_gauge(conviction_score, title):
     fig.update_layout(height=300)
     return fig
 
+# Compiled overlap kernel, built on first use; False means numba is unavailable
+_numba_overlap_kernel = None
+
+def _get_numba_overlap_kernel():
+    """Compile (once) a parallel two-pointer overlap kernel; returns None without numba"""
+    global _numba_overlap_kernel
+    if _numba_overlap_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _numba_overlap_kernel = False
+        else:
+            @njit(parallel=True, cache=True)
+            def pairwise_overlap(indptr, ids, n_schemes):
+                out = np.zeros((n_schemes, n_schemes), dtype=np.int32)
+                for i in prange(n_schemes):
+                    a_start, a_end = indptr[i], indptr[i + 1]
+                    out[i, i] = a_end - a_start
+                    for j in range(i + 1, n_schemes):
+                        b_start, b_end = indptr[j], indptr[j + 1]
+                        a, b, common = a_start, b_start, 0
+                        # ids are sorted per scheme, so a merge walk counts the intersection
+                        while a < a_end and b < b_end:
+                            if ids[a] == ids[b]:
+                                common += 1
+                                a += 1
+                                b += 1
+                            elif ids[a] < ids[b]:
+                                a += 1
+                            else:
+                                b += 1
+                        out[i, j] = common
+                        out[j, i] = common
+                return out
+            _numba_overlap_kernel = pairwise_overlap
+    return _numba_overlap_kernel or None
+
+# Past this many schemes the dense incidence matmul starts to hurt; prefer the CSR kernel
+NUMBA_OVERLAP_MIN_SCHEMES = 200
+
 # Function to create enhanced visualizations
+@st.cache_data(show_spinner=False)
 def create_enhanced_visualizations(stock_conviction, df, scheme_col, stock_col, min_schemes):
     """Create enhanced interactive visualizations"""
-    
-    # Filter based on minimum schemes
-    filtered_conviction = stock_conviction[stock_conviction['Scheme_Count'] >= min_schemes].copy()
+    # Deferred so the welcome screen never pays the plotly import
+    import plotly.express as px
+
+    # Filter based on minimum schemes (read-only downstream, so no defensive copy)
+    filtered_conviction = stock_conviction.loc[stock_conviction['Scheme_Count'] >= min_schemes]
     
     # 1. High Conviction Stocks Bar Chart
     fig_conviction = px.bar(
@@ -184,9 +521,10 @@ def create_enhanced_visualizations(stock_conviction, df, scheme_col, stock_col,
         }
     )
     fig_conviction.update_layout(yaxis={'categoryorder': 'total ascending'})
+    fig_conviction.update_traces(marker_line_width=0)
     
     # 2. Conviction Distribution
-    conviction_dist = filtered_conviction['Conviction_Category'].value_counts()
+    conviction_dist = filtered_conviction['Conviction_Category'].value_counts(sort=False)
     fig_dist = px.pie(
         values=conviction_dist.values,
         names=conviction_dist.index,
@@ -199,48 +537,182 @@ def create_enhanced_visualizations(stock_conviction, df, scheme_col, stock_col,
     )
     
     # 3. Scheme Overlap Heatmap
-    schemes = df[scheme_col].unique()
-    overlap_matrix = pd.DataFrame(index=schemes, columns=schemes)
-    
-    for scheme1 in schemes:
-        stocks1 = set(df[df[scheme_col] == scheme1][stock_col])
-        for scheme2 in schemes:
-            stocks2 = set(df[df[scheme_col] == scheme2][stock_col])
-            overlap = len(stocks1.intersection(stocks2))
-            overlap_matrix.loc[scheme1, scheme2] = overlap
-    
-    overlap_matrix = overlap_matrix.astype(float)
-    
-    fig_heatmap = px.imshow(
-        overlap_matrix,
-        title="🔄 Portfolio Convergence Heatmap",
-        labels=dict(x="Scheme", y="Scheme", color="Common Stocks"),
-        aspect="auto",
-        color_continuous_scale="Viridis"
+    n_schemes = df[scheme_col].nunique()
+    kernel = _get_numba_overlap_kernel() if n_schemes > NUMBA_OVERLAP_MIN_SCHEMES else None
+    if kernel is not None:
+        # CSR-style layout over unique (scheme, stock) pairs - skips the dense incidence matrix
+        pairs = df[[scheme_col, stock_col]].drop_duplicates()
+        scheme_codes = pairs[scheme_col].cat.codes.to_numpy(np.int64)
+        stock_codes = pairs[stock_col].cat.codes.to_numpy(np.int64)
+        order = np.lexsort((stock_codes, scheme_codes))
+        scheme_codes, stock_codes = scheme_codes[order], stock_codes[order]
+        indptr = np.zeros(n_schemes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(scheme_codes, minlength=n_schemes), out=indptr[1:])
+        overlap_np = kernel(indptr, stock_codes, n_schemes)
+        schemes = df[scheme_col].cat.categories
+    else:
+        # Boolean scheme x stock incidence matrix; one matmul replaces the O(S^2) set intersections
+        incidence_df = pd.crosstab(df[scheme_col], df[stock_col]) > 0
+        schemes = incidence_df.index
+        incidence = incidence_df.to_numpy().astype(np.int32)
+        overlap_np = incidence @ incidence.T
+    overlap_matrix = pd.DataFrame(overlap_np, index=schemes, columns=schemes)
+    
+    # Plotly hits a render cliff on very wide heatmaps; past 40 schemes show the
+    # most cross-held ones (the full matrix still backs the convergence table)
+    heat_np, heat_schemes = overlap_np, schemes
+    heat_title = "🔄 Portfolio Convergence Heatmap"
+    if n_schemes > 40:
+        cross_holdings = overlap_np.sum(axis=1) - np.diag(overlap_np)
+        top_idx = np.sort(np.argsort(-cross_holdings)[:40])
+        heat_np = overlap_np[np.ix_(top_idx, top_idx)]
+        heat_schemes = schemes[top_idx]
+        heat_title += " (top 40 schemes by cross-holding)"
+
+    # Bare go.Heatmap trace: skips px.imshow's image pipeline and serializes less JSON
+    import plotly.graph_objects as go
+    fig_heatmap = go.Figure(go.Heatmap(
+        z=heat_np,
+        x=list(heat_schemes),
+        y=list(heat_schemes),
+        colorscale="Viridis",
+        zsmooth=False,
+        colorbar={'title': 'Common Stocks'},
+        hovertemplate='%{y} ↔ %{x}: %{z}<extra></extra>'
+    ))
+    fig_heatmap.update_layout(
+        title=heat_title,
+        xaxis_title="Scheme",
+        yaxis_title="Scheme"
     )
     
-    return fig_conviction, fig_dist, fig_heatmap, filtered_conviction
+    return fig_conviction, fig_dist, fig_heatmap, filtered_conviction, overlap_matrix
 
 # Main app logic
+EXPLORER_PAGE_SIZE = 500
+
+@st.fragment
+def render_data_explorer(processed_df, scheme_col, stock_col, stock_conviction):
+    """Data Explorer panel; a fragment so filter clicks rerun only this block"""
+    ss = st.session_state
+
+    st.markdown("## 📋 Data Explorer")
+
+    # Advanced filters
+    st.markdown("### 🔍 Advanced Filters")
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        scheme_filter = st.multiselect(
+            "Filter by Scheme:",
+            ss['scheme_options'],
+            default=[]
+        )
+
+    with col2:
+        stock_filter = st.multiselect(
+            "Filter by Stock:",
+            ss['stock_options'][:50],
+            default=[]
+        )
+
+    with col3:
+        conviction_filter = st.selectbox(
+            "Filter by Conviction:",
+            ["All", "🟢 High Conviction", "🟡 Medium Conviction", "🔵 Low Conviction"],
+            index=0
+        )
+
+    # Apply filters (memoized, so reruns with unchanged selections skip the masks)
+    no_filters = not scheme_filter and not stock_filter and conviction_filter == "All"
+    if conviction_filter != "All":
+        conviction_stocks = tuple(stock_conviction[
+            stock_conviction['Conviction_Category'] == conviction_filter
+        ]['Stock'])
+    else:
+        conviction_stocks = None
+
+    if no_filters:
+        filtered_df = processed_df
+    else:
+        filtered_df = apply_explorer_filters(
+            processed_df, scheme_col, stock_col,
+            tuple(scheme_filter), tuple(stock_filter), conviction_stocks
+        )
+
+    # Display filtered data; large results are paginated so each rerun ships a
+    # bounded slice to the browser instead of the whole frame
+    st.markdown(f"### 📊 Filtered Data ({len(filtered_df)} rows)")
+    if len(filtered_df) > EXPLORER_PAGE_SIZE:
+        n_pages = (len(filtered_df) + EXPLORER_PAGE_SIZE - 1) // EXPLORER_PAGE_SIZE
+        page = st.number_input("Page", min_value=1, max_value=n_pages, value=1)
+        if no_filters:
+            # Unfiltered pages slice the Arrow table built once at load -
+            # zero-copy, no per-rerun pandas->Arrow conversion
+            page_view = ss['processed_table'].slice(
+                (page - 1) * EXPLORER_PAGE_SIZE, EXPLORER_PAGE_SIZE
+            )
+        else:
+            page_view = filtered_df.iloc[
+                (page - 1) * EXPLORER_PAGE_SIZE:page * EXPLORER_PAGE_SIZE
+            ]
+        st.dataframe(page_view, use_container_width=True)
+    elif no_filters:
+        # Unfiltered view reuses the Arrow table built once at load
+        st.dataframe(ss['processed_table'], use_container_width=True)
+    else:
+        st.dataframe(filtered_df, use_container_width=True)
+
+    # Download filtered data
+    if not filtered_df.empty:
+        st.download_button(
+            label="📥 Download Filtered Data",
+            data=to_csv_bytes(filtered_df),
+            file_name=f"filtered_analysis_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
+            mime="text/csv"
+        )
+
 def main():
+    # One proxy lookup up front; plain dict access is cheaper than the
+    # SessionStateProxy __getitem__ on every read below
+    ss = st.session_state
+
+    # Market-cap enrichment is opt-in: it fans out to yfinance for every unique stock
+    fetch_market_caps_enabled = st.sidebar.checkbox(
+        "🏷️ Fetch Market Caps (yfinance)",
+        value=False,
+        help="Look up market cap for every unique stock to enable cap-wise analysis"
+    )
+
     # Load data button
     if st.sidebar.button("🚀 Load & Analyze Data", type="primary"):
         with st.spinner("Loading and analyzing data..."):
             df = load_consolidated_data(google_sheets_url)
-            
+
             if df is not None and not df.empty:
                 result = process_consolidated_data_enhanced(df)
-                
+
                 if result is not None:
                     processed_df, scheme_col, stock_col, stock_conviction, total_schemes = result
-                    
+
+                    if fetch_market_caps_enabled:
+                        enrich_with_market_caps(processed_df, stock_col)
+
                     # Store in session state
-                    st.session_state['processed_data'] = processed_df
-                    st.session_state['scheme_col'] = scheme_col
-                    st.session_state['stock_col'] = stock_col
-                    st.session_state['stock_conviction'] = stock_conviction
-                    st.session_state['total_schemes'] = total_schemes
-                    st.session_state['raw_data'] = df
+                    ss['processed_data'] = processed_df
+                    ss['scheme_col'] = scheme_col
+                    ss['stock_col'] = stock_col
+                    ss['stock_conviction'] = stock_conviction
+                    ss['total_schemes'] = total_schemes
+                    ss['raw_data'] = df
+                    # Widget options straight from the categorical dtype - already
+                    # deduplicated, no column scan
+                    ss['scheme_options'] = processed_df[scheme_col].cat.categories.tolist()
+                    ss['stock_options'] = processed_df[stock_col].cat.categories.tolist()
+                    # Arrow table converted once; st.dataframe takes it without re-serializing
+                    import pyarrow as pa
+                    ss['processed_table'] = pa.Table.from_pandas(processed_df)
                     
                     st.success(f"✅ Successfully analyzed {len(df)} holdings across {total_schemes} schemes")
                     st.rerun()
@@ -250,12 +722,12 @@ def main():
                 st.error("❌ Failed to load data")
     
     # Display enhanced dashboard if data is available
-    if 'processed_data' in st.session_state:
-        processed_df = st.session_state['processed_data']
-        scheme_col = st.session_state['scheme_col']
-        stock_col = st.session_state['stock_col']
-        stock_conviction = st.session_state['stock_conviction']
-        total_schemes = st.session_state['total_schemes']
+    if 'processed_data' in ss:
+        processed_df = ss['processed_data']
+        scheme_col = ss['scheme_col']
+        stock_col = ss['stock_col']
+        stock_conviction = ss['stock_conviction']
+        total_schemes = ss['total_schemes']
         
         # Interactive Controls
         st.sidebar.markdown("---")
@@ -280,20 +752,26 @@ def main():
         )
         
         # Generate enhanced visualizations
-        fig_conviction, fig_dist, fig_heatmap, filtered_conviction = create_enhanced_visualizations(
+        fig_conviction, fig_dist, fig_heatmap, filtered_conviction, overlap_matrix = create_enhanced_visualizations(
             stock_conviction, processed_df, scheme_col, stock_col, min_schemes
         )
         
-        # Dashboard Tabs
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "🏠 Executive Summary",
-            "🎯 High Conviction Picks", 
-            "🔄 Portfolio Convergence",
-            "📈 Concentration Analysis",
-            "📋 Data Explorer"
-        ])
-        
-        with tab1:
+        # Dashboard views: a radio dispatch runs only the active panel's code,
+        # where st.tabs would re-execute every panel on each rerun
+        active_tab = st.radio(
+            "Dashboard View",
+            [
+                "🏠 Executive Summary",
+                "🎯 High Conviction Picks",
+                "🔄 Portfolio Convergence",
+                "📈 Concentration Analysis",
+                "📋 Data Explorer"
+            ],
+            horizontal=True,
+            label_visibility="collapsed"
+        )
+
+        if active_tab == "🏠 Executive Summary":
             st.markdown("## 🏠 Executive Summary")
             
             # Key Metrics
@@ -331,13 +809,18 @@ def main():
             with col2:
                 # Top 5 conviction stocks gauge
                 st.markdown("#### 🎯 Top 5 Conviction Scores")
-                for i in range(min(5, len(stock_conviction))):
-                    stock = stock_conviction.iloc[i]
-                    progress_color = "🟢" if stock['Conviction_Score'] >= 50 else "🟡" if stock['Conviction_Score'] >= 25 else "🔵"
-                    st.write(f"{progress_color} **{stock['Stock']}**: {stock['Conviction_Score']:.1f}%")
-                    st.progress(stock['Conviction_Score'] / 100)
+                # Column-wise access: pull the arrays once instead of building a Series per row
+                top_stock_names = stock_conviction['Stock'].to_numpy()
+                top_stock_scores = stock_conviction['Conviction_Score'].to_numpy()
+                top_stock_colors = np.select(
+                    [top_stock_scores >= 50, top_stock_scores >= 25], ["🟢", "🟡"], default="🔵"
+                )
+                for i in range(min(5, len(top_stock_names))):
+                    st.write(f"{top_stock_colors[i]} **{top_stock_names[i]}**: {top_stock_scores[i]:.1f}%")
+                    # float(): st.progress rejects np.float32 scalars
+                    st.progress(float(top_stock_scores[i]) / 100)
         
-        with tab2:
+        elif active_tab == "🎯 High Conviction Picks":
             st.markdown("## 🎯 High Conviction Analysis")
             
             # Filter controls
@@ -350,9 +833,9 @@ def main():
                 st.markdown(f"**Conviction Score ≥{min_conviction_score}%**")
             
             # Apply conviction score filter
-            display_conviction = filtered_conviction[
+            display_conviction = filtered_conviction.loc[
                 filtered_conviction['Conviction_Score'] >= min_conviction_score
-            ].copy()
+            ]
             
             # High conviction chart
             st.plotly_chart(fig_conviction, use_container_width=True)
@@ -360,38 +843,35 @@ def main():
             # Detailed conviction table
             st.markdown("### 📋 Detailed Conviction Analysis")
             
-            # Prepare display dataframe
+            # Prepare display dataframe; scheme lists only for the stocks actually shown,
+            # deduplicated up front so the join aggregation needs no per-group lambda
             display_df = display_conviction.copy()
-            display_df['Schemes'] = display_df['Schemes_List'].apply(
-                lambda x: ', '.join(x) if isinstance(x, list) else str(x)
+            schemes_map = (
+                processed_df[processed_df[stock_col].isin(display_df['Stock'])]
+                .drop_duplicates([stock_col, scheme_col])
+                .groupby(stock_col, sort=False, observed=True)[scheme_col]
+                .agg(', '.join)
             )
+            display_df['Schemes'] = display_df['Stock'].map(schemes_map).fillna('')
             
-            # Style the dataframe
-            def style_conviction(val):
-                if "🟢" in val:
-                    return 'background-color: #38ef7d; color: white'
-                elif "🟡" in val:
-                    return 'background-color: #f5576c; color: white'
-                else:
-                    return 'background-color: #4facfe; color: white'
-            
-            styled_df = display_df[['Stock', 'Scheme_Count', 'Conviction_Score', 'Conviction_Category', 'Schemes']].style.applymap(
-                style_conviction, subset=['Conviction_Category']
+            # Style the dataframe (vectorized: one map per column, not one call per cell)
+            styled_df = display_df[['Stock', 'Scheme_Count', 'Conviction_Score', 'Conviction_Category', 'Schemes']].style.apply(
+                lambda col: col.map(CONVICTION_STYLES).fillna('background-color: #4facfe; color: white'),
+                subset=['Conviction_Category']
             )
             
             st.dataframe(styled_df, use_container_width=True)
             
             # Download high conviction picks
             if not display_df.empty:
-                csv = display_df.to_csv(index=False)
                 st.download_button(
                     label="📥 Download High Conviction Picks",
-                    data=csv,
+                    data=to_csv_bytes(display_df),
                     file_name=f"high_conviction_picks_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
                     mime="text/csv"
                 )
         
-        with tab3:
+        elif active_tab == "🔄 Portfolio Convergence":
             st.markdown("## 🔄 Portfolio Convergence Analysis")
             
             # Convergence heatmap
@@ -400,49 +880,37 @@ def main():
             # Convergence statistics
             st.markdown("### 📊 Convergence Statistics")
             
-            # Calculate convergence metrics
-            schemes = processed_df[scheme_col].unique()
-            convergence_stats = []
-            
-            for i, scheme1 in enumerate(schemes):
-                for j, scheme2 in enumerate(schemes):
-                    if i < j:
-                        stocks1 = set(processed_df[processed_df[scheme_col] == scheme1][stock_col])
-                        stocks2 = set(processed_df[processed_df[scheme_col] == scheme2][stock_col])
-                        
-                        common_stocks = len(stocks1.intersection(stocks2))
-                        total_unique = len(stocks1.union(stocks2))
-                        
-                        # Jaccard similarity
-                        jaccard_similarity = (common_stocks / total_unique * 100) if total_unique > 0 else 0
-                        
-                        convergence_stats.append({
-                            'Scheme 1': scheme1,
-                            'Scheme 2': scheme2,
-                            'Common Stocks': common_stocks,
-                            'Convergence Score': round(jaccard_similarity, 1)
-                        })
-            
-            convergence_df = pd.DataFrame(convergence_stats).sort_values('Convergence Score', ascending=False)
+            # Derive Jaccard stats from the overlap matrix already built for the heatmap
+            convergence_df = compute_convergence_table(overlap_matrix)
             
             # Top convergent pairs
             st.markdown("#### 🤝 Most Convergent Scheme Pairs")
             top_convergent = convergence_df.head(10)
             
-            for _, row in top_convergent.iterrows():
-                score = row['Convergence Score']
-                color = "🟢" if score >= 50 else "🟡" if score >= 25 else "🔵"
-                st.write(f"{color} **{row['Scheme 1']}** ↔ **{row['Scheme 2']}**: {score}% similarity ({row['Common Stocks']} common stocks)")
+            # One markdown block instead of one Streamlit message per pair,
+            # built with vectorized string concatenation - no row iteration at all
+            pair_colors = np.select(
+                [top_convergent['Convergence Score'] >= 50, top_convergent['Convergence Score'] >= 25],
+                ["🟢", "🟡"], default="🔵"
+            )
+            pair_lines = (
+                pair_colors + " **" + top_convergent['Scheme 1'].astype(str)
+                + "** ↔ **" + top_convergent['Scheme 2'].astype(str)
+                + "**: " + top_convergent['Convergence Score'].astype(str)
+                + "% similarity (" + top_convergent['Common Stocks'].astype(str)
+                + " common stocks)"
+            )
+            st.markdown("\n\n".join(pair_lines))
         
-        with tab4:
+        elif active_tab == "📈 Concentration Analysis":
             st.markdown("## 📈 Concentration Analysis")
             
             # Scheme-wise concentration
             st.markdown("### 🎯 Scheme-wise Holdings Concentration")
             
-            scheme_holdings = processed_df.groupby(scheme_col).size().reset_index(name='Holdings_Count')
-            scheme_holdings = scheme_holdings.sort_values('Holdings_Count', ascending=False)
+            scheme_holdings = compute_scheme_holdings(processed_df, scheme_col)
             
+            import plotly.express as px
             fig_concentration = px.bar(
                 scheme_holdings,
                 x='Holdings_Count',
@@ -481,64 +949,9 @@ def main():
                 if not low_concentration_schemes.empty:
                     st.info(f"ℹ️ {len(low_concentration_schemes)} schemes have low concentration (<{avg_holdings*0.5:.0f} holdings)")
         
-        with tab5:
-            st.markdown("## 📋 Data Explorer")
-            
-            # Advanced filters
-            st.markdown("### 🔍 Advanced Filters")
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                scheme_filter = st.multiselect(
-                    "Filter by Scheme:",
-                    processed_df[scheme_col].unique(),
-                    default=[]
-                )
-            
-            with col2:
-                stock_filter = st.multiselect(
-                    "Filter by Stock:",
-                    processed_df[stock_col].unique()[:50],
-                    default=[]
-                )
-            
-            with col3:
-                conviction_filter = st.selectbox(
-                    "Filter by Conviction:",
-                    ["All", "🟢 High Conviction", "🟡 Medium Conviction", "🔵 Low Conviction"],
-                    index=0
-                )
-            
-            # Apply filters
-            filtered_df = processed_df.copy()
-            
-            if scheme_filter:
-                filtered_df = filtered_df[filtered_df[scheme_col].isin(scheme_filter)]
-            
-            if stock_filter:
-                filtered_df = filtered_df[filtered_df[stock_col].isin(stock_filter)]
-            
-            if conviction_filter != "All":
-                conviction_stocks = stock_conviction[
-                    stock_conviction['Conviction_Category'] == conviction_filter
-                ]['Stock'].tolist()
-                filtered_df = filtered_df[filtered_df[stock_col].isin(conviction_stocks)]
-            
-            # Display filtered data
-            st.markdown(f"### 📊 Filtered Data ({len(filtered_df)} rows)")
-            st.dataframe(filtered_df, use_container_width=True)
-            
-            # Download filtered data
-            if not filtered_df.empty:
-                csv = filtered_df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download Filtered Data",
-                    data=csv,
-                    file_name=f"filtered_analysis_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
-    
+        elif active_tab == "📋 Data Explorer":
+            render_data_explorer(processed_df, scheme_col, stock_col, stock_conviction)
+
     else:
         # Welcome screen
         st.markdown("## 🚀 Welcome to Smart Mutual Fund Analysis")
@@ -576,6 +989,45 @@ def main():
             - Mobile-friendly design
             """)
 
+        # Pre-computed comparison summary (run utils/comparator.py to refresh)
+        comparison = load_comparison_summary()
+        if comparison is not None:
+            small_cap_df, mid_cap_df = comparison
+            st.markdown("### 📌 Top Stocks Comparison")
+
+            summary_df = pd.concat(
+                [small_cap_df.assign(Cap="Small Cap"), mid_cap_df.assign(Cap="Mid Cap")],
+                ignore_index=True
+            )
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.markdown("#### 🔹 Small Cap")
+                st.markdown(
+                    summary_table_html(tuple(small_cap_df.itertuples(index=False, name=None))),
+                    unsafe_allow_html=True
+                )
+
+            with col2:
+                st.markdown("#### 🔸 Mid Cap")
+                st.markdown(
+                    summary_table_html(tuple(mid_cap_df.itertuples(index=False, name=None))),
+                    unsafe_allow_html=True
+                )
+
+            # Cached on the counts tuple, so unrelated reruns reuse the same figure
+            sentiment_counts = summary_df['Sentiment'].value_counts()
+            fig_sentiment = make_sentiment_pie(tuple(sorted(sentiment_counts.items())))
+            st.plotly_chart(fig_sentiment, use_container_width=True)
+
+            st.download_button(
+                label="📥 Download Comparison Summary",
+                data=fast_to_csv(summary_df),
+                file_name="top_stocks_comparison.csv",
+                mime="text/csv"
+            )
+
 # Gold Mining Analysis Functions
 def calculate_conviction_momentum(stock_conviction):
     """Find stocks gaining momentum across schemes"""
@@ -597,7 +1049,7 @@ def find_hidden_gems(processed_df, stock_conviction, scheme_col, stock_col):
     """Find undervalued high-conviction picks"""
     
     # Stocks held by quality schemes but not mainstream
-    quality_schemes = processed_df.groupby(scheme_col).size().sort_values(ascending=False).head(10).index
+    quality_schemes = processed_df.groupby(scheme_col, observed=True).size().sort_values(ascending=False).head(10).index
     
     hidden_gems = []
     for stock in stock_conviction['Stock']:
@@ -635,28 +1087,25 @@ def detect_consensus_breakouts(stock_conviction, threshold=25):
 
 def track_smart_money(processed_df, stock_conviction, scheme_col, stock_col):
     """Identify which schemes are consistently picking winners"""
-    
+    conviction_by_stock = stock_conviction.set_index('Stock')['Conviction_Score']
+
     scheme_performance = {}
-    
-    for scheme in processed_df[scheme_col].unique():
-        scheme_stocks = processed_df[processed_df[scheme_col] == scheme][stock_col].unique()
-        
-        # Calculate scheme's stock selection quality
-        total_conviction = 0
-        for stock in scheme_stocks:
-            stock_conviction_score = stock_conviction[
-                stock_conviction['Stock'] == stock
-            ]['Conviction_Score'].iloc[0] if len(stock_conviction[stock_conviction['Stock'] == stock]) > 0 else 0
-            total_conviction += stock_conviction_score
-        
-        avg_conviction = total_conviction / len(scheme_stocks) if len(scheme_stocks) > 0 else 0
-        
+
+    # One groupby pass hands each scheme its stocks - no full-frame rescan per scheme,
+    # and conviction scores come from an indexed lookup instead of per-stock filters
+    for scheme, stocks in processed_df.groupby(scheme_col, observed=True)[stock_col]:
+        scheme_stocks = np.asarray(stocks.unique())
+        if len(scheme_stocks) > 0:
+            avg_conviction = conviction_by_stock.reindex(scheme_stocks).fillna(0).to_numpy().mean()
+        else:
+            avg_conviction = 0
+
         scheme_performance[scheme] = {
             'Holdings_Count': len(scheme_stocks),
             'Avg_Conviction': avg_conviction,
             'Smart_Money_Score': avg_conviction * len(scheme_stocks) / 100
         }
-    
+
     return pd.DataFrame(scheme_performance).T.sort_values('Smart_Money_Score', ascending=False)
 
 def create_consensus_portfolio(stock_conviction, top_n=20, min_conviction=30):
@@ -680,19 +1129,18 @@ def identify_risk_flags(processed_df, stock_conviction, scheme_col, stock_col):
     
     risk_flags = []
     
-    # Over-concentration risk
+    # Over-concentration risk: weight every stock in one array op, then only
+    # walk the (few) flagged rows instead of iterrows over the whole table
     total_holdings = len(processed_df)
-    for _, row in stock_conviction.iterrows():
-        stock = row['Stock']
-        stock_weight = (row['Total_Appearances'] / total_holdings) * 100
-        
-        if stock_weight > 15:  # More than 15% of all holdings
-            risk_flags.append({
-                'Stock': stock,
-                'Risk_Type': 'Over-Concentration',
-                'Risk_Level': 'HIGH' if stock_weight > 25 else 'MEDIUM',
-                'Details': f'{stock_weight:.1f}% of all holdings'
-            })
+    weights = stock_conviction['Total_Appearances'].to_numpy() / total_holdings * 100
+    flagged = weights > 15  # More than 15% of all holdings
+    for stock, stock_weight in zip(stock_conviction['Stock'].to_numpy()[flagged], weights[flagged]):
+        risk_flags.append({
+            'Stock': stock,
+            'Risk_Type': 'Over-Concentration',
+            'Risk_Level': 'HIGH' if stock_weight > 25 else 'MEDIUM',
+            'Details': f'{stock_weight:.1f}% of all holdings'
+        })
     
     # Herd mentality risk
     high_conviction_stocks = stock_conviction[stock_conviction['Conviction_Score'] > 70]
@@ -718,64 +1166,5 @@ def optimize_diversification(processed_df, stock_conviction, scheme_col, stock_c
     
     return underrepresented.sort_values('Conviction_Score', ascending=False)
 
-# Function to create enhanced visualizations
-def create_enhanced_visualizations(stock_conviction, df, scheme_col, stock_col, min_schemes):
-    """Create enhanced interactive visualizations"""
-    
-    # Filter based on minimum schemes
-    filtered_conviction = stock_conviction[stock_conviction['Scheme_Count'] >= min_schemes].copy()
-    
-    # 1. High Conviction Stocks Bar Chart
-    fig_conviction = px.bar(
-        filtered_conviction.head(20),
-        x='Conviction_Score',
-        y='Stock',
-        color='Conviction_Category',
-        title=f"🎯 Top 20 High Conviction Stocks (Min {min_schemes} Schemes)",
-        labels={'Conviction_Score': 'Conviction Score (%)', 'Stock': 'Stock'},
-        color_discrete_map={
-            "🟢 High Conviction": "#38ef7d",
-            "🟡 Medium Conviction": "#f5576c", 
-            "🔵 Low Conviction": "#4facfe"
-        }
-    )
-    fig_conviction.update_layout(yaxis={'categoryorder': 'total ascending'})
-    
-    # 2. Conviction Distribution
-    conviction_dist = filtered_conviction['Conviction_Category'].value_counts()
-    fig_dist = px.pie(
-        values=conviction_dist.values,
-        names=conviction_dist.index,
-        title=f"🎯 Conviction Distribution (Min {min_schemes} Schemes)",
-        color_discrete_map={
-            "🟢 High Conviction": "#38ef7d",
-            "🟡 Medium Conviction": "#f5576c",
-            "🔵 Low Conviction": "#4facfe"
-        }
-    )
-    
-    # 3. Scheme Overlap Heatmap
-    schemes = df[scheme_col].unique()
-    overlap_matrix = pd.DataFrame(index=schemes, columns=schemes)
-    
-    for scheme1 in schemes:
-        stocks1 = set(df[df[scheme_col] == scheme1][stock_col])
-        for scheme2 in schemes:
-            stocks2 = set(df[df[scheme_col] == scheme2][stock_col])
-            overlap = len(stocks1.intersection(stocks2))
-            overlap_matrix.loc[scheme1, scheme2] = overlap
-    
-    overlap_matrix = overlap_matrix.astype(float)
-    
-    fig_heatmap = px.imshow(
-        overlap_matrix,
-        title="🔄 Portfolio Convergence Heatmap",
-        labels=dict(x="Scheme", y="Scheme", color="Common Stocks"),
-        aspect="auto",
-        color_continuous_scale="Viridis"
-    )
-    
-    return fig_conviction, fig_dist, fig_heatmap, filtered_conviction
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import re
+import sqlite3
+import time
+import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+from utils.http import get_http_session
+
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+
+# Compiled once; normalize_symbol runs for every unique stock name
+_SUFFIX_RE = re.compile(r'\s*(LTD\.?|LIMITED)\s*$', re.IGNORECASE)
+_CLEAN_TABLE = str.maketrans('', '', ' .')
+
+def normalize_symbol(company_name):
+    """Normalize a company name to a symbol base: drop Ltd/Limited, spaces, and case"""
+    return _SUFFIX_RE.sub('', company_name).upper().translate(_CLEAN_TABLE)
+
+EQUITY_LIST_URL = "https://archives.nseindia.com/content/equities/EQUITY_L.csv"
+
+# Lazy {normalized company name: NSE symbol} map; empty dict if the download fails
+_nse_symbol_map = None
+
+def get_nse_symbol_map():
+    """Load NSE's equity list once and index it by normalized company name
+
+    An exact symbol from the exchange's own list beats guessing ticker
+    variants name-by-name over the network.
+    """
+    global _nse_symbol_map
+    if _nse_symbol_map is None:
+        try:
+            import io
+            import pandas as pd
+            response = get_http_session().get(EQUITY_LIST_URL, timeout=30)
+            frame = pd.read_csv(io.BytesIO(response.content))
+            _nse_symbol_map = {
+                normalize_symbol(name): symbol
+                for name, symbol in zip(frame['NAME OF COMPANY'], frame['SYMBOL'])
+            }
+        except Exception:
+            _nse_symbol_map = {}
+    return _nse_symbol_map
+
+@lru_cache(maxsize=8192)
+def resolve_symbol_base(company_name):
+    """Exact NSE symbol when the equity list knows the name, else the normalized guess
+
+    Memoized - the same names recur on every fetch round and cache refresh,
+    so resolution is a dict hit after the first pass.
+    """
+    normalized = normalize_symbol(company_name)
+    return get_nse_symbol_map().get(normalized, normalized)
+
+def get_market_cap_yfinance(company_name):
+    """Fetch market cap (USD) for an Indian stock via yfinance, trying NSE then BSE"""
+    symbol_base = resolve_symbol_base(company_name)
+    for suffix in ('.NS', '.BO'):
+        try:
+            # fast_info pulls just the quote fields instead of the full .info scrape
+            cap = yf.Ticker(symbol_base + suffix, session=get_http_session()).fast_info['market_cap']
+            if cap:
+                return cap
+        except Exception:
+            continue
+    return None
+
+def categorize_market_cap(market_cap_usd):
+    """Bucket a USD market cap into Small/Mid/Large using INR crore cutoffs"""
+    if not market_cap_usd:
+        return 'Not Available'
+    crores = market_cap_usd * 83 / 1e7
+    if crores >= 20000:
+        return 'Large Cap'
+    elif crores >= 5000:
+        return 'Mid Cap'
+    else:
+        return 'Small Cap'
+
+# Yahoo's quote endpoint accepts comma-joined symbol lists up to ~20 per URL
+BATCH_SIZE = 20
+
+async def _fetch_batch(session, semaphore, symbols):
+    """GET one comma-joined symbol batch; returns {symbol: marketCap}"""
+    async with semaphore:
+        try:
+            async with session.get(QUOTE_URL, params={"symbols": ",".join(symbols)}) as response:
+                data = await response.json()
+            return {q["symbol"]: q.get("marketCap") for q in data["quoteResponse"]["result"]}
+        except Exception:
+            return {}
+
+async def _gather_caps(names, progress_callback=None):
+    """Fetch all names in symbol batches over one connection-pooled aiohttp session"""
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(10)
+    connector = aiohttp.TCPConnector(limit=20)
+    caps = {}
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # First round on the NSE suffix; one batched retry on BSE for the misses
+        pending = {name: resolve_symbol_base(name) for name in names}
+        for suffix in ('.NS', '.BO'):
+            symbol_map = {base + suffix: name for name, base in pending.items()}
+            symbols = list(symbol_map)
+            batches = [symbols[i:i + BATCH_SIZE] for i in range(0, len(symbols), BATCH_SIZE)]
+            for done, coro in enumerate(asyncio.as_completed(
+                    [_fetch_batch(session, semaphore, batch) for batch in batches]), 1):
+                for symbol, cap in (await coro).items():
+                    if cap:
+                        caps[symbol_map[symbol]] = cap
+                if progress_callback and suffix == '.NS':
+                    progress_callback(done, len(batches))
+            pending = {name: base for name, base in pending.items() if name not in caps}
+            if not pending:
+                break
+    return caps
+
+def _fetch_caps_threaded(company_names, max_workers=16):
+    """Threaded yfinance lookups for names the quote endpoint missed"""
+    caps = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(get_market_cap_yfinance, name): name for name in company_names}
+        for future in as_completed(futures):
+            caps[futures[future]] = future.result()
+    return caps
+
+# Per-name SQLite side-cache: overlapping universes only fetch the diff
+CACHE_DB = "data/marketcap_cache.db"
+CACHE_MAX_AGE = 86400
+
+def _cache_conn():
+    if not os.path.isdir("data"):
+        os.makedirs("data")
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS name_marketcap"
+        " (name TEXT PRIMARY KEY, market_cap REAL, fetched_at INTEGER)"
+    )
+    return conn
+
+def _load_cached_caps(conn, names):
+    """Caps cached within CACHE_MAX_AGE for the requested names"""
+    cutoff = int(time.time()) - CACHE_MAX_AGE
+    placeholders = ",".join("?" * len(names))
+    rows = conn.execute(
+        f"SELECT name, market_cap FROM name_marketcap"
+        f" WHERE fetched_at > ? AND name IN ({placeholders})",
+        (cutoff, *names)
+    )
+    return dict(rows)
+
+def fetch_market_caps(company_names, max_workers=16, progress_callback=None):
+    """Fetch market caps for unique names - async against Yahoo's quote endpoint,
+    with a threaded yfinance fallback for anything it missed. Fresh results from
+    the side-cache are reused; only the diff goes to the network."""
+    unique_names = [n for n in dict.fromkeys(company_names) if n]
+    conn = _cache_conn()
+    try:
+        caps = _load_cached_caps(conn, unique_names)
+        to_fetch = [name for name in unique_names if name not in caps]
+        if to_fetch:
+            fetched = asyncio.run(_gather_caps(to_fetch, progress_callback))
+            missing = [name for name in to_fetch if not fetched.get(name)]
+            if missing:
+                fetched.update(_fetch_caps_threaded(missing, max_workers))
+            now = int(time.time())
+            conn.executemany(
+                "INSERT OR REPLACE INTO name_marketcap VALUES (?, ?, ?)",
+                [(name, cap, now) for name, cap in fetched.items() if cap]
+            )
+            conn.commit()
+            caps.update(fetched)
+    finally:
+        conn.close()
+    return caps
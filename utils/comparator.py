@@ -7,39 +7,55 @@ def generate_summary_table():
     top_small = get_top_10_smallcaps()
     top_mid = get_top_10_midcaps()
 
+    # Flatten every holding into one long frame, then aggregate per stock in a
+    # single groupby instead of rescanning each scheme per top stock
+    holdings_df = pd.DataFrame([
+        {
+            "scheme": scheme,
+            "stock": entry["stock"].lower(),
+            "percent_aum": entry["percent_aum"],
+            "sentiment": entry["sentiment"],
+        }
+        for scheme, stocks in holdings.items()
+        for entry in stocks
+    ])
+    if holdings_df.empty:
+        # No holdings at all: every top stock reports as unheld
+        return {
+            cap_type: [
+                {"Stock": stock, "# Funds Holding": 0, "Avg % AUM": 0, "Sentiment": "Not Held"}
+                for stock in top_stocks
+            ]
+            for cap_type, top_stocks in [("small_cap", top_small), ("mid_cap", top_mid)]
+        }
+    stock_agg = holdings_df.groupby("stock").agg(
+        fund_count=("scheme", "nunique"),
+        avg_aum=("percent_aum", "mean"),
+        sentiment=("sentiment", lambda s: s.mode().iat[0]),
+    )
+
     summary = {"small_cap": [], "mid_cap": []}
 
     for cap_type, top_stocks in [("small_cap", top_small), ("mid_cap", top_mid)]:
-        rows = []
-        for stock in top_stocks:
-            fund_count = 0
-            total_percent = 0
-            sentiments = []
-
-            for scheme, stocks in holdings.items():
-                matched = [s for s in stocks if s["stock"].lower() == stock.lower()]
-                if matched:
-                    fund_count += 1
-                    total_percent += matched[0]["percent_aum"]
-                    sentiments.append(matched[0]["sentiment"])
-
-            avg_aum = round(total_percent / fund_count, 2) if fund_count else 0
-            dominant_sentiment = max(set(sentiments), key=sentiments.count) if sentiments else "Not Held"
-
-            rows.append({
+        matched = stock_agg.reindex([stock.lower() for stock in top_stocks])
+        summary[cap_type] = [
+            {
                 "Stock": stock,
-                "# Funds Holding": fund_count,
-                "Avg % AUM": avg_aum,
-                "Sentiment": dominant_sentiment
-            })
-
-        summary[cap_type] = rows
+                "# Funds Holding": 0 if pd.isna(row.fund_count) else int(row.fund_count),
+                "Avg % AUM": 0 if pd.isna(row.avg_aum) else round(row.avg_aum, 2),
+                "Sentiment": row.sentiment if isinstance(row.sentiment, str) else "Not Held",
+            }
+            for stock, row in zip(top_stocks, matched.itertuples())
+        ]
 
     return summary
 
 # Generate and dump to file (used before Streamlit run)
 if __name__ == "__main__":
     data = generate_summary_table()
-    import json
-    with open("data/processed/comparison_output.json", "w") as f:
-        json.dump(data, f, indent=2)
+    import orjson
+    import os
+    if not os.path.isdir("data/processed"):
+        os.makedirs("data/processed")
+    with open("data/processed/comparison_output.json", "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
@@ -0,0 +1,24 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_session = None
+
+def get_http_session():
+    """Shared requests.Session with a connection pool and retries
+
+    Keep-alive reuse saves a TCP+TLS handshake per request against the
+    same host (Google Sheets, Yahoo Finance).
+    """
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            max_retries=Retry(total=3, backoff_factor=0.3),
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _session = session
+    return _session